@@ -3,14 +3,14 @@ from typing import List, Tuple
 from datetime import datetime
 import logging
 import re
-import json
 
-from ...core import app_logger
+from ...core import app_logger, LazyJson
 from ...models.chat import ChatMessage, MessageRole, BookingStage
 from ..session_service import session_service
 from ..data_service import data_service
 from third_party.membership.service import membership_service
 from app.llm.bedrock import BedrockLLM
+from app.llm.integrations.bedrock_chat import SYSTEM_PROMPT
 
 
 class ChatHandlers:
@@ -54,10 +54,7 @@ class ChatHandlers:
             }
 
             # greeting to LLM
-            prompt_template=f"It is {datetime.now()} at this moment, let's begin our conversation. Please note to follow the INTERACTION GUIDELINES."
-            
-            with open("app/llm/prompts/travel_buddy_prompt.txt", "r") as f:
-                system_prompt = f.read()
+            prompt_template=f"It is {datetime.now():%Y-%m-%d %H:%M} at this moment, let's begin our conversation. Please note to follow the INTERACTION GUIDELINES."
 
             # Create instance of BedrockLLM for static method
             llm = BedrockLLM()
@@ -65,7 +62,7 @@ class ChatHandlers:
             # Use converse API for greeting - no tools needed for initial greeting
             response = await llm.generate(
                 prompt_temp=prompt_template,
-                system_prompt=system_prompt,
+                system_prompt=SYSTEM_PROMPT,
                 context=context,
                 temperature=0.7,
                 max_tokens=200,  # Shorter response for greeting
@@ -118,7 +115,7 @@ class ChatHandlers:
 
             # Log state updates if any
             if "state" in result:
-                app_logger.info(f"Message processing resulted in state update: {json.dumps(result['state'])}")
+                app_logger.info("Message processing resulted in state update: %s", LazyJson(result['state']))
 
             # Update chat history
             history.extend([
@@ -174,7 +171,7 @@ class ChatHandlers:
 
             # Log state updates if any
             if "state" in result:
-                app_logger.info(f"File upload processing resulted in state update: {json.dumps(result['state'])}")
+                app_logger.info("File upload processing resulted in state update: %s", LazyJson(result['state']))
 
             # Update chat history
             history.extend([
@@ -1,12 +1,11 @@
 from datetime import datetime
-import json
 import uuid
 from typing import Dict, Optional, Any
 
 from ..models.chat import ChatSession, ChatMessage, MessageRole, BookingStage
 from ..llm.integrations.bedrock_chat import BedrockChatIntegration
 from .data_service import data_service
-from ..core import app_logger
+from ..core import app_logger, LazyJson
 
 class SessionService:
     # Confirmation keywords that trigger transition from stage 4 to 5
@@ -210,7 +209,7 @@ class SessionService:
         # Update session with any state changes from the response
         if result.get("state"):
             state = result["state"]
-            app_logger.info(f"Received state update: {json.dumps(state)}")
+            app_logger.info("Received state update: %s", LazyJson(state))
             
             # Process each state update field that can trigger stage transitions
             for field in self.STATE_UPDATE_FIELDS:
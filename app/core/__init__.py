@@ -1,4 +1,6 @@
 from .config import settings
 from .logging import app_logger
+from .cache import TTLCache
+from .serialization import json_dumps, json_loads, LazyJson
 
-__all__ = ["settings", "app_logger"]
+__all__ = ["settings", "app_logger", "TTLCache", "json_dumps", "json_loads", "LazyJson"]
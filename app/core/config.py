@@ -16,9 +16,41 @@ class Settings(BaseSettings):
     # Bedrock Settings
     BEDROCK_REGION: str = "us-west-2"
     BEDROCK_MODEL_ID: str = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+    # HTTP connection pool, retry and timeout settings for Bedrock clients
+    BEDROCK_MAX_POOL_CONNECTIONS: int = 64
+    BEDROCK_MAX_RETRY_ATTEMPTS: int = 8
+    BEDROCK_CONNECT_TIMEOUT: int = 5
+    BEDROCK_READ_TIMEOUT: int = 120
+    # Mark the system prompt and tool specs as cacheable prompt prefixes. Only
+    # enable this for a model and account with Bedrock prompt caching access;
+    # otherwise the Converse API rejects cachePoint blocks with a ValidationException
+    BEDROCK_PROMPT_CACHING: bool = False
+    # Longer string values in the prompt context are truncated to this length
+    CONTEXT_MAX_FIELD_CHARS: int = 1000
+    # Maximum number of concurrent requests issued by BedrockLLM.batch_generate
+    BEDROCK_MAX_CONCURRENCY: int = 8
+    # Per-turn bound: tools run in parallel for a single model turn (also sizes the sync tool thread pool)
+    TOOL_TURN_CONCURRENCY: int = 8
+    # Process-wide bound: concurrent calls of any one tool across all conversations
+    TOOL_GLOBAL_CONCURRENCY: int = 32
+    # Seconds a read-only tool result is reused for identical tool input
+    TOOL_CACHE_TTL: int = 60
+    # Sliding window applied to the messages sent during tool round-trips
+    CONVERSATION_MAX_MESSAGES: int = 20
+    CONVERSATION_MAX_CHARS: int = 32000
+    # Tool results older than the most recent turns and larger than this
+    # are replaced by a short note once the model has consumed them
+    TOOL_RESULT_KEEP_TURNS: int = 2
+    TOOL_RESULT_COMPACT_CHARS: int = 2000
+    # Tool results larger than this are sent as pre-serialized JSON text
+    TOOL_RESULT_TEXT_CHARS: int = 4096
+    # Seconds a member profile is reused as chat context
+    PROFILE_CACHE_TTL: int = 60
 
     # RAG Settings
     KNOWLEDGE_BASE_ID: str = "OYWXI5HX47"
+    # Seconds a knowledge base answer is reused for the same query
+    RAG_CACHE_TTL: int = 3600
     
     # DynamoDB Settings
     DYNAMODB_TABLE_NAME: str = "travel_buddy_db"
@@ -26,6 +58,23 @@ class Settings(BaseSettings):
     # Textract File Upload Settings
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     SUPPORTED_FILE_TYPES: List[str] = ["image/jpeg", "image/png", "application/pdf"]
+    # HTTP connection pool and retry settings of the shared Textract client
+    TEXTRACT_MAX_POOL_CONNECTIONS: int = 32
+    TEXTRACT_MAX_RETRY_ATTEMPTS: int = 10
+    # Maximum number of concurrent Textract document analyses, prefetches included
+    TEXTRACT_MAX_CONCURRENCY: int = 8
+    # Analyze uploaded documents before the model asks for them. After
+    # DOCUMENT_PREFETCH_MIN_SAMPLES prefetches, prefetching stops if fewer than
+    # DOCUMENT_PREFETCH_MIN_HIT_RATE of them were used.
+    DOCUMENT_PREFETCH: bool = True
+    DOCUMENT_PREFETCH_MIN_SAMPLES: int = 20
+    DOCUMENT_PREFETCH_MIN_HIT_RATE: float = 0.5
+    # Optional bucket that large documents are uploaded to once, so Textract
+    # retries reference the S3 object instead of resending the image bytes.
+    # Each object is deleted once its analysis finishes.
+    TEXTRACT_S3_BUCKET: Optional[str] = None
+    # Documents larger than this many bytes go through TEXTRACT_S3_BUCKET
+    TEXTRACT_S3_MIN_BYTES: int = 1024 * 1024  # 1MB
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,48 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    """
+    Serialize an object to compact JSON text, using orjson when installed.
+    Values that are not JSON types (e.g. datetime) are converted to strings.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+
+    return json.dumps(
+        obj,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        default=str
+    )
+
+
+def json_loads(data: str) -> Any:
+    """Parse JSON text, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class LazyJson:
+    """
+    Defer JSON serialization of a log argument until the record is emitted,
+    e.g. app_logger.info("State: %s", LazyJson(state))
+    """
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return json_dumps(self.obj)
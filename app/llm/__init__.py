@@ -1,9 +1,17 @@
 from .tools import LLMTools, Tool, ToolResult
-from .bedrock import bedrock_client
+from .bedrock import get_bedrock_client
 
 __all__ = [
     "LLMTools",
     "Tool",
     "ToolResult",
-    "bedrock_client"
+    "bedrock_client",
+    "get_bedrock_client"
 ]
+
+
+def __getattr__(name):
+    # Resolve bedrock_client lazily so importing the package stays cheap
+    if name == "bedrock_client":
+        return get_bedrock_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
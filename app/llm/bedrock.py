@@ -1,14 +1,52 @@
-import json
+import asyncio
+import hashlib
+import inspect
+import time
 import boto3
-from typing import List, Dict, Any, Optional, Callable, Awaitable, Union
-from ..core import settings, app_logger
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, partial
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Union, AsyncIterator
+from ..core import settings, app_logger, TTLCache, json_dumps, json_loads, LazyJson
 from .tools import Tool, ToolResult
 
 
+def _prune_empty(value: Any, max_str_chars: Optional[int] = None) -> Any:
+    """
+    Drop None and empty values from a payload sent to the model, so it only
+    carries information the model can use. Strings longer than max_str_chars,
+    if given, are truncated.
+    """
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = _prune_empty(item, max_str_chars)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, (list, tuple)):
+        return [_prune_empty(item, max_str_chars) for item in value]
+    if isinstance(value, str) and max_str_chars is not None and len(value) > max_str_chars:
+        return value[:max_str_chars] + "..."
+    return value
+
+
+def _content_chars(value: Any) -> int:
+    """Estimate the size of message content from its text lengths, without serializing it"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + _content_chars(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_content_chars(item) for item in value)
+    return len(str(value))
+
+
 class BedrockLLM:
     """High-level interface for Bedrock LLM operations"""
     def __init__(self):
-        self.client = BedrockClient()
+        self.client = get_bedrock_client()
 
     async def generate(
         self,        
@@ -50,22 +88,173 @@ class BedrockLLM:
             app_logger.error(f"Error generating LLM response: {str(e)}")
             raise
 
+    async def astream_generate(
+        self,
+        system_prompt: str,
+        prompt_temp: str,
+        context: Dict[str, Any],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        use_rag: Optional[bool] = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the Bedrock LLM as text chunks arrive
+        
+        Args:
+            system_prompt: Optional system prompt to guide the model's behavior
+            prompt_temp: The prompt template to use
+            context: Context information to inform the response
+            temperature: Controls randomness in generation
+            max_tokens: Maximum tokens to generate
+            use_rag: Whether to try the knowledge base first
+            
+        Yields:
+            Text chunks of the response
+        """
+        async for event in self.stream(
+            system_prompt=system_prompt,
+            prompt_temp=prompt_temp,
+            context=context,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_rag=use_rag
+        ):
+            if "text" in event:
+                yield event["text"]
+
+    async def stream(
+        self,
+        system_prompt: str,
+        prompt_temp: str,
+        context: Dict[str, Any],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        use_rag: Optional[bool] = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response from the Bedrock LLM, running tools as they are requested
+        
+        Args:
+            system_prompt: Optional system prompt to guide the model's behavior
+            prompt_temp: The prompt template to use
+            context: Context information to inform the response
+            temperature: Controls randomness in generation
+            max_tokens: Maximum tokens to generate
+            tools: Optional list of dicts containing tool spec and function
+                  [{"tool": Tool, "function": Callable}]
+            use_rag: Whether to try the knowledge base first
+            
+        Yields:
+            {"text": chunk} events as text arrives, a {"toolUse": dict} event
+            for each requested tool, then a {"state": dict} event if tools
+            produced state updates
+        """
+        try:
+            async for event in self.client.stream_response(
+                system_prompt=system_prompt,
+                prompt_temp=prompt_temp,
+                context=context,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                tools=tools,
+                use_rag=use_rag
+            ):
+                yield event
+        except Exception as e:
+            app_logger.error(f"Error streaming LLM response: {str(e)}")
+            raise
+
+    async def batch_generate(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> List[Union[str, Dict[str, Any], Exception]]:
+        """
+        Generate responses for several independent prompts concurrently
+        
+        Args:
+            requests: List of keyword argument dicts for generate(), e.g.
+                     [{"system_prompt": ..., "prompt_temp": ..., "context": ...}]
+            
+        Returns:
+            Results in the same order as requests; a failed request yields
+            its exception instead of raising
+        """
+        semaphore = asyncio.Semaphore(settings.BEDROCK_MAX_CONCURRENCY)
+
+        async def _generate_one(request: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+            async with semaphore:
+                return await self.generate(**request)
+
+        return await asyncio.gather(
+            *(_generate_one(request) for request in requests),
+            return_exceptions=True
+        )
+
 
 class BedrockClient:
     """Low-level client for AWS Bedrock API interactions"""
+    # Read-only tools whose results can be reused for identical input
+    CACHEABLE_TOOLS = frozenset({"get_available_lounges", "check_membership_points"})
+    # Cached tool results invalidated when the key tool succeeds
+    TOOL_CACHE_INVALIDATIONS = {"book_lounge": frozenset({"check_membership_points"})}
+    # Prompt caching checkpoint appended after static request prefixes
+    CACHE_POINT = {"cachePoint": {"type": "default"}}
+
     def __init__(self):
-        self.runtime_client = boto3.client(
+        self.model_id = settings.BEDROCK_MODEL_ID
+        self.knowledge_base_id = settings.KNOWLEDGE_BASE_ID
+
+        # Invariant parts of every converse request, built once per client
+        self._base_params = {"modelId": self.model_id}
+        self._system_blocks: Dict[str, List[Dict[str, str]]] = {}
+        self._tool_configs: Dict[tuple, Dict[str, Any]] = {}
+
+        self._tool_cache = TTLCache(maxsize=1024, ttl=settings.TOOL_CACHE_TTL)
+        self._rag_cache = TTLCache(maxsize=512, ttl=settings.RAG_CACHE_TTL)
+        # Deterministic requests currently in flight, keyed by request hash
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Per-tool limits on concurrent calls across all conversations
+        self._tool_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @cached_property
+    def _tool_executor(self) -> ThreadPoolExecutor:
+        """Dedicated pool for synchronous tool functions, created on first use"""
+        return ThreadPoolExecutor(
+            max_workers=settings.TOOL_TURN_CONCURRENCY,
+            thread_name_prefix="bedrock-tool"
+        )
+
+    @cached_property
+    def _boto_config(self) -> Config:
+        """Connection pool, retry and timeout configuration shared by both clients"""
+        return Config(
+            region_name=settings.BEDROCK_REGION,
+            max_pool_connections=settings.BEDROCK_MAX_POOL_CONNECTIONS,
+            retries={
+                "max_attempts": settings.BEDROCK_MAX_RETRY_ATTEMPTS,
+                "mode": "adaptive"
+            },
+            tcp_keepalive=True,
+            connect_timeout=settings.BEDROCK_CONNECT_TIMEOUT,
+            read_timeout=settings.BEDROCK_READ_TIMEOUT
+        )
+
+    @cached_property
+    def runtime_client(self):
+        """Bedrock runtime client, created on first API call"""
+        return boto3.client(
             'bedrock-runtime',
-            region_name=settings.BEDROCK_REGION
+            config=self._boto_config
         )
-        
-        self.agent_runtime_client = boto3.client(
+
+    @cached_property
+    def agent_runtime_client(self):
+        """Bedrock agent runtime client, only needed when RAG is used"""
+        return boto3.client(
             'bedrock-agent-runtime',
-            region_name=settings.BEDROCK_REGION
+            config=self._boto_config
         )
-        
-        self.model_id = settings.BEDROCK_MODEL_ID
-        self.knowledge_base_id = settings.KNOWLEDGE_BASE_ID
 
     async def generate_response(
         self,
@@ -79,71 +268,196 @@ class BedrockClient:
         max_recursions: int = 5
     ) -> Union[str, Dict[str, Any]]:
         """Generate a response using Claude via AWS Bedrock with optional tool use"""
+        request = dict(
+            system_prompt=system_prompt,
+            prompt_temp=prompt_temp,
+            context=context,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=tools,
+            use_rag=use_rag,
+            max_recursions=max_recursions
+        )
+
+        # Tool use may differ per caller and sampled responses should differ,
+        # so only identical deterministic requests share one Bedrock call
+        if tools or temperature > 0:
+            return await self._generate_response(**request)
+
+        key = hashlib.blake2b(
+            json_dumps(
+                [system_prompt, prompt_temp, context, max_tokens, use_rag, max_recursions],
+                sort_keys=True
+            ).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_response(**request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            app_logger.info("Joining identical in-flight Bedrock request")
+
+        # Shield so one caller being cancelled does not cancel the others
+        return await asyncio.shield(task)
+
+    async def _generate_response(
+        self,
+        system_prompt: str,
+        prompt_temp: str,
+        context: Dict[str, Any],
+        temperature: float,
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        use_rag: Optional[bool],
+        max_recursions: int
+    ) -> Union[str, Dict[str, Any]]:
+        """Run a single generate_response request by buffering its streamed response"""
+        text_parts = []
+        state_updates = {}
+        async for event in self.stream_response(
+            system_prompt=system_prompt,
+            prompt_temp=prompt_temp,
+            context=context,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=tools,
+            use_rag=use_rag,
+            max_recursions=max_recursions
+        ):
+            if "text" in event:
+                text_parts.append(event["text"])
+            elif "toolUse" in event:
+                # Text before a tool call belongs to an intermediate turn
+                text_parts = []
+            elif "state" in event:
+                state_updates = event["state"]
+
+        response_text = "".join(text_parts)
+        if state_updates:
+            return {"response": response_text, "state": state_updates}
+        return response_text
+
+    async def stream_response(
+        self,
+        system_prompt: str,
+        prompt_temp: str,
+        context: Dict[str, Any],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        use_rag: Optional[bool] = False,
+        max_recursions: int = 5
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response from Claude via the Bedrock converse_stream API.
+        Each requested tool starts as soon as its toolUse block has streamed,
+        while the rest of the model turn is still arriving.
+        """
         try:
-            # Format the initial message with proper structure
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "text": f"{prompt_temp}\n\nContext: {json.dumps(context)}"
-                        }
-                    ]
-                }
-            ]
+            messages = self._build_messages(prompt_temp, context)
 
-            # Try RAG if enabled
+            # Try RAG if enabled; knowledge base answers arrive in one piece
             if use_rag and self.knowledge_base_id:
                 rag_response = await self._try_rag_response(messages)
                 if rag_response:
-                    return rag_response
-
-            # Prepare request parameters
-            request_params = {
-                "modelId": self.model_id,
-                "messages": messages,
-                "inferenceConfig": {
-                    "maxTokens": max_tokens,
-                    "temperature": temperature,
-                    "stopSequences": []
-                }
-            }
-
-            # Add system if provided
-            if system_prompt:
-                request_params["system"] = [{"text": system_prompt}]
-
-            # Add tool configuration only if tools are provided
-            if tools:
-                request_params["toolConfig"] = {
-                    "tools": [
-                        {
-                            "toolSpec": self._convert_tool_to_spec(tool["tool"])
-                        } for tool in tools
-                    ],
-                    "toolChoice": {
-                        "auto": {}
-                    }
-                }
+                    yield {"text": rag_response}
+                    return
 
-            # Start conversation with Bedrock
-            response = self.runtime_client.converse(**request_params)
-            
-            # Process the response recursively if needed
-            return await self._process_response(
-                response=response,
-                messages=messages,
-                tool_config=request_params.get("toolConfig"),
-                tools=tools,
-                system=request_params.get("system"),
+            request_params = self._build_request_params(
+                system=self._get_system_blocks(system_prompt) if system_prompt else None,
+                tool_config=self._get_tool_config(tools) if tools else None,
                 temperature=temperature,
-                max_tokens=max_tokens,
-                max_recursions=max_recursions
+                max_tokens=max_tokens
             )
+            tool_functions = {tool["tool"].name: tool["function"] for tool in tools} if tools else {}
+            tool_semaphore = asyncio.Semaphore(settings.TOOL_TURN_CONCURRENCY)
+            state_updates = {}
+            tool_tasks: Dict[int, asyncio.Task] = {}
+
+            for _ in range(max_recursions):
+                # Content blocks of the model turn by index, and read-only tools
+                # already started, by their position in tool_uses
+                blocks: Dict[int, Dict[str, Any]] = {}
+                tool_uses = []
+                tool_tasks = {}
+                stop_reason = None
+
+                async for event in self._converse_stream(request_params, self._trim_messages(messages)):
+                    if "contentBlockStart" in event:
+                        block_start = event["contentBlockStart"]
+                        tool_use = block_start["start"].get("toolUse")
+                        if tool_use:
+                            blocks[block_start["contentBlockIndex"]] = {"toolUse": dict(tool_use), "input": []}
+                    elif "contentBlockDelta" in event:
+                        index = event["contentBlockDelta"].get("contentBlockIndex", 0)
+                        delta = event["contentBlockDelta"]["delta"]
+                        if "text" in delta:
+                            blocks.setdefault(index, {"text": []})["text"].append(delta["text"])
+                            yield {"text": delta["text"]}
+                        elif "toolUse" in delta:
+                            blocks[index]["input"].append(delta["toolUse"]["input"])
+                    elif "contentBlockStop" in event:
+                        block = blocks.get(event["contentBlockStop"]["contentBlockIndex"])
+                        if block and "toolUse" in block:
+                            tool_use = block["toolUse"]
+                            tool_use["input"] = json_loads("".join(block["input"]) or "{}")
+                            tool_uses.append(tool_use)
+                            yield {"toolUse": tool_use}
+                            # Tools with side effects wait until the turn is complete
+                            if tool_functions and tool_use.get("name") in self.CACHEABLE_TOOLS:
+                                tool_tasks[len(tool_uses) - 1] = asyncio.create_task(
+                                    self._run_tool(tool_use, tool_functions, tool_semaphore)
+                                )
+                    elif "messageStop" in event:
+                        stop_reason = event["messageStop"].get("stopReason")
+
+                # Add model's response to conversation
+                messages.append({
+                    "role": "assistant",
+                    "content": [
+                        {"toolUse": block["toolUse"]} if "toolUse" in block else {"text": "".join(block["text"])}
+                        for _, block in sorted(blocks.items())
+                    ]
+                })
+
+                if not (stop_reason == "tool_use" and tool_uses and tool_functions):
+                    if state_updates:
+                        yield {"state": state_updates}
+                    return
+
+                # Read-only tools are already running; run the others and wait for all
+                results = await self._run_tools(tool_uses, tool_functions, tool_semaphore, tool_tasks)
+                messages.append({
+                    "role": "user",
+                    "content": self._collect_tool_results(tool_uses, results, state_updates)
+                })
+                self._compact_tool_results(messages)
+
+            raise Exception("Maximum number of tool use recursions reached")
 
         except Exception as e:
-            app_logger.error(f"Error generating response from Bedrock: {str(e)}")
+            app_logger.error(f"Error streaming response from Bedrock: {str(e)}")
             raise
+        finally:
+            # Stop tools nobody will read, also when the caller aborts the stream
+            for task in tool_tasks.values():
+                task.cancel()
+
+    def _build_messages(self, prompt_temp: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Format the initial user message with the prompt and its context"""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "text": f"{prompt_temp}\n\nContext: {self._serialize_context(context)}"
+                    }
+                ]
+            }
+        ]
 
     async def _try_rag_response(self, messages: List[Dict[str, Any]]) -> Optional[str]:
         """Try to get a response using RAG if possible"""
@@ -155,10 +469,21 @@ class BedrockClient:
             )
             
             if last_user_msg:
+                # Serve repeated queries (ignoring case and spacing) from cache
+                cache_key = hashlib.blake2b(
+                    " ".join(last_user_msg.lower().split()).encode(),
+                    digest_size=16
+                ).hexdigest()
+                cached_text = self._rag_cache.get(cache_key)
+                if cached_text is not None:
+                    app_logger.info("Using cached knowledge base response")
+                    return cached_text
+
                 # Construct the model ARN using the region and model ID
                 model_arn = f"arn:aws:bedrock:{settings.BEDROCK_REGION}::foundation-model/{self.model_id}"
                 
-                rag_response = self.agent_runtime_client.retrieve_and_generate(
+                rag_response = await asyncio.to_thread(
+                    self.agent_runtime_client.retrieve_and_generate,
                     input={
                         "text": last_user_msg
                     },
@@ -177,6 +502,7 @@ class BedrockClient:
                 )
                 
                 if 'output' in rag_response and 'text' in rag_response['output']:
+                    self._rag_cache.set(cache_key, rag_response['output']['text'])
                     return rag_response['output']['text']
                     
         except Exception as e:
@@ -184,18 +510,123 @@ class BedrockClient:
             
         return None
     
-    def _send_to_bedrock(
+    @staticmethod
+    def _serialize_context(context: Dict[str, Any]) -> str:
+        """Serialize the prompt context as compact JSON to keep input tokens down"""
+        return json_dumps(_prune_empty(context, settings.CONTEXT_MAX_FIELD_CHARS))
+
+    def _get_system_blocks(self, system_prompt: str) -> List[Dict[str, str]]:
+        """Get the converse system blocks for a prompt, reusing them across requests"""
+        system = self._system_blocks.get(system_prompt)
+        if system is None:
+            system = [{"text": system_prompt}]
+            if settings.BEDROCK_PROMPT_CACHING:
+                # Let Bedrock reuse the static system prompt prefix across turns
+                system.append(self.CACHE_POINT)
+            self._system_blocks[system_prompt] = system
+        return system
+
+    def _get_tool_config(self, tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Get the converse toolConfig for a set of tools. The config is built
+        once per tool set and the same dict is passed to every round-trip.
+        """
+        key = tuple(tool["tool"].name for tool in tools)
+        tool_config = self._tool_configs.get(key)
+        if tool_config is None:
+            tool_config = {
+                "tools": [
+                    {
+                        "toolSpec": self._convert_tool_to_spec(tool["tool"])
+                    } for tool in tools
+                ],
+                "toolChoice": {
+                    "auto": {}
+                }
+            }
+            if settings.BEDROCK_PROMPT_CACHING:
+                tool_config["tools"].append(self.CACHE_POINT)
+            self._tool_configs[key] = tool_config
+        return tool_config
+
+    @staticmethod
+    def _tool_result_content(result: ToolResult) -> Dict[str, Any]:
+        """
+        Build the toolResult content block for a tool result. Large payloads
+        are serialized once and sent as text, so botocore does not walk the
+        whole structure again on every round-trip.
+        """
+        payload = _prune_empty(result.data or {}) if result.success else {"error": result.error}
+        serialized = json_dumps(payload)
+        if len(serialized) > settings.TOOL_RESULT_TEXT_CHARS:
+            return {"text": serialized}
+        return {"json": payload}
+
+    @staticmethod
+    def _compact_tool_results(messages: List[Dict[str, Any]]) -> None:
+        """
+        Replace large tool result payloads the model has already consumed
+        with a short note. The toolResult blocks themselves are kept so each
+        toolUse still has a matching toolUseId and status.
+        """
+        tool_result_messages = [
+            msg for msg in messages
+            if msg["role"] == "user" and any("toolResult" in block for block in msg["content"])
+        ]
+
+        for msg in tool_result_messages[:-settings.TOOL_RESULT_KEEP_TURNS or None]:
+            for block in msg["content"]:
+                tool_result = block.get("toolResult")
+                if not tool_result:
+                    continue
+                if _content_chars(tool_result["content"]) > settings.TOOL_RESULT_COMPACT_CHARS:
+                    tool_result["content"] = [{"text": "Result omitted; it was already provided earlier in this conversation."}]
+
+    @staticmethod
+    def _trim_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Limit the conversation sent to Bedrock to a sliding window.
+        The first user message is always kept, followed by the most recent
+        messages starting at an assistant turn, so every toolResult still
+        follows the assistant message holding its toolUse.
+        """
+        max_messages = settings.CONVERSATION_MAX_MESSAGES
+        max_chars = settings.CONVERSATION_MAX_CHARS
+
+        # One size estimate per message, reused by the window walk below
+        message_chars = [_content_chars(msg["content"]) for msg in messages]
+        if len(messages) <= max_messages and sum(message_chars) <= max_chars:
+            return messages
+
+        first_message = messages[0]
+        window_chars = message_chars[0]
+        start = len(messages)
+
+        # Walk back from the newest message, keeping whole turns
+        for index in range(len(messages) - 1, 0, -1):
+            window_chars += message_chars[index]
+            if messages[index]["role"] != "assistant":
+                continue
+            if start < len(messages) and (
+                len(messages) - index + 1 > max_messages or window_chars > max_chars
+            ):
+                break
+            start = index
+
+        trimmed = [first_message] + messages[start:]
+        app_logger.info(f"Trimmed conversation from {len(messages)} to {len(trimmed)} messages")
+        return trimmed
+
+    def _build_request_params(
         self,
-        messages: List[Dict[str, Any]],
         tool_config: Optional[Dict[str, Any]] = None,
         system: Optional[List[Dict[str, str]]] = None,
         temperature: float = 0.7,
         max_tokens: int = 2048
     ) -> Dict[str, Any]:
-        """Send conversation to Bedrock"""
+        """Build converse request parameters, without messages"""
         request_params = {
-            "modelId": self.model_id,
-            "messages": messages,
+            **self._base_params,
             "inferenceConfig": {
                 "maxTokens": max_tokens,
                 "temperature": temperature,
@@ -203,129 +634,144 @@ class BedrockClient:
             }
         }
 
+        # system and toolConfig are shared by reference, not copied
         if system:
             request_params["system"] = system
 
         if tool_config:
             request_params["toolConfig"] = tool_config
 
-        return self.runtime_client.converse(**request_params)
+        return request_params
 
-    async def _process_response(
+    async def _converse_stream(
         self,
-        response: Dict[str, Any],
-        messages: List[Dict[str, Any]],
-        tool_config: Optional[Dict[str, Any]],
-        tools: Optional[List[Dict[str, Any]]],
-        system: Optional[List[Dict[str, str]]],
-        temperature: float,
-        max_tokens: int,
-        max_recursions: int
-    ) -> Union[str, Dict[str, Any]]:
-        """Process Bedrock response and handle tool use recursively"""
-        if max_recursions <= 0:
-            raise Exception("Maximum number of tool use recursions reached")
+        request_params: Dict[str, Any],
+        messages: List[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream conversation events from Bedrock without blocking the event loop"""
+        request_params["messages"] = messages
 
-        # Extract response content from converse API format
-        output = response.get("output", {})
-        message = output.get("message", {})
-        message_content = message.get("content", [])
-        stop_reason = response.get("stopReason")
-        
-        # Add model's response to conversation
-        messages.append({
-            "role": "assistant",
-            "content": message_content
-        })
-
-        # Process each content item
-        response_text = ""
-        tool_uses = []
-        state_updates = {}
+        start = time.perf_counter()
+        response = await asyncio.to_thread(self.runtime_client.converse_stream, **request_params)
 
-        for content in message_content:
-            if isinstance(content, dict):
-                if "text" in content:
-                    response_text += content["text"]
-                elif "toolUse" in content:
-                    tool_use = content["toolUse"]
-                    if isinstance(tool_use, dict) and "name" in tool_use:
-                        tool_uses.append(tool_use)
-
-        # If stop reason is tool_use, execute tools and continue conversation
-        if stop_reason == "tool_use" and tool_uses and tools:
-            tool_results_messages = []
-            
-            for tool_use in tool_uses:
-                app_logger.info(f"Use tool: {tool_use.get('name')}")
-                result = await self._execute_tool(tool_use, tools)
-                app_logger.info(f"{tool_use.get('name')} finished successful: {result.success}")
-                
-                # Get state updates from tool result
-                if result.success:
-                    tool_state = result.get_state_update()
-                    app_logger.info(f"Tool state update: {json.dumps(tool_state)}")
-                    state_updates.update(tool_state)
-                
-                tool_results_messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "toolResult": {
-                                "toolUseId": tool_use.get("toolUseId", ""),
-                                "content": [{"json": result.data if result.success else {"error": result.error}}],
-                                "status": "success" if result.success else "error"
-                            }
-                        }
-                    ]
-                })
+        # The event stream is a blocking iterator, so read each event in a worker thread
+        stream = response["stream"]
+        events = iter(stream)
+        try:
+            while (event := await asyncio.to_thread(next, events, None)) is not None:
+                if "metadata" in event:
+                    self._log_usage("converse_stream", start, event["metadata"].get("usage", {}))
+                yield event
+        finally:
+            # Release the connection, also when the caller stops reading early
+            if hasattr(stream, "close"):
+                stream.close()
 
-            # Add tool results to conversation
-            messages.extend(tool_results_messages)
+    @staticmethod
+    def _log_usage(operation: str, start: float, usage: Dict[str, int]) -> None:
+        """Log the latency and token usage of a Bedrock call"""
+        app_logger.info(
+            f"Bedrock {operation} completed in {time.perf_counter() - start:.2f}s, "
+            f"input tokens: {usage.get('inputTokens', 0)}, "
+            f"output tokens: {usage.get('outputTokens', 0)}, "
+            f"cache read tokens: {usage.get('cacheReadInputTokens', 0)}, "
+            f"cache write tokens: {usage.get('cacheWriteInputTokens', 0)}"
+        )
 
-            # Continue conversation with tool results
-            next_response = self._send_to_bedrock(
-                messages=messages,
-                tool_config=tool_config,
-                system=system,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            final_response = await self._process_response(
-                response=next_response,
-                messages=messages,
-                tool_config=tool_config,
-                tools=tools,
-                system=system,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                max_recursions=max_recursions - 1
+    async def _run_tools(
+        self,
+        tool_uses: List[Dict[str, Any]],
+        tool_functions: Dict[str, Callable[..., Any]],
+        semaphore: asyncio.Semaphore,
+        started: Optional[Dict[int, asyncio.Task]] = None
+    ) -> List[Union[ToolResult, BaseException]]:
+        """
+        Run the tools of a model turn and return their results in toolUse order.
+        Read-only tools run concurrently. All other tools may have side effects,
+        such as spending points, so they run one at a time in toolUse order.
+        """
+        read_only_tasks = {
+            index: (started or {}).get(index) or asyncio.create_task(
+                self._run_tool(tool_use, tool_functions, semaphore)
             )
+            for index, tool_use in enumerate(tool_uses)
+            if tool_use.get("name") in self.CACHEABLE_TOOLS
+        }
+        results: List[Union[ToolResult, BaseException, None]] = [None] * len(tool_uses)
 
-            # If state updates exist, return both response and state
-            if state_updates:
-                if isinstance(final_response, str):
-                    return {
-                        "response": final_response,
-                        "state": state_updates
-                    }
-                elif isinstance(final_response, dict):
-                    if "state" in final_response:
-                        final_response["state"].update(state_updates)
-                    else:
-                        final_response["state"] = state_updates
-                    return final_response
+        try:
+            for index, tool_use in enumerate(tool_uses):
+                if index not in read_only_tasks:
+                    try:
+                        results[index] = await self._run_tool(tool_use, tool_functions, semaphore)
+                    except Exception as e:
+                        results[index] = e
 
-            return final_response
+            read_only_results = await asyncio.gather(*read_only_tasks.values(), return_exceptions=True)
+            for index, result in zip(read_only_tasks, read_only_results):
+                results[index] = result
+        finally:
+            for task in read_only_tasks.values():
+                task.cancel()
 
-        # Return final response text if no tool uses or end_turn
-        return response_text
+        return results
+
+    async def _run_tool(
+        self,
+        tool_use: Dict[str, Any],
+        tool_functions: Dict[str, Callable[..., Any]],
+        semaphore: asyncio.Semaphore
+    ) -> ToolResult:
+        """Execute a tool, limiting how many tools of a turn run at once"""
+        async with semaphore:
+            app_logger.info(f"Use tool: {tool_use.get('name')}")
+            return await self._execute_tool(tool_use, tool_functions)
+
+    def _collect_tool_results(
+        self,
+        tool_uses: List[Dict[str, Any]],
+        results: List[Union[ToolResult, BaseException]],
+        state_updates: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the toolResult blocks for a model turn, in toolUse order, and
+        merge the state updates of successful tools into state_updates
+        """
+        tool_results = []
+
+        for tool_use, result in zip(tool_uses, results):
+            if isinstance(result, BaseException):
+                result = ToolResult(success=False, error=str(result))
+            app_logger.info(f"{tool_use.get('name')} finished successful: {result.success}")
+
+            # Get state updates from tool result
+            if result.success:
+                tool_state = result.get_state_update()
+                app_logger.info("Tool state update: %s", LazyJson(tool_state))
+                state_updates.update(tool_state)
+
+            tool_results.append({
+                "toolResult": {
+                    "toolUseId": tool_use.get("toolUseId", ""),
+                    "content": [self._tool_result_content(result)],
+                    "status": "success" if result.success else "error"
+                }
+            })
+
+        return tool_results
+
+    def _get_tool_semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent calls of a tool"""
+        semaphore = self._tool_semaphores.get(tool_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.TOOL_GLOBAL_CONCURRENCY)
+            self._tool_semaphores[tool_name] = semaphore
+        return semaphore
 
     async def _execute_tool(
         self, 
         tool_use: Dict[str, Any], 
-        tools: List[Dict[str, Any]]
+        tool_functions: Dict[str, Callable[..., Any]]
     ) -> ToolResult:
         """Execute the requested tool and return results"""
         try:
@@ -335,23 +781,47 @@ class BedrockClient:
                 
             tool_input = tool_use.get("input", {})
             
-            # Find the tool function from the provided tools list
-            tool_func = next(
-                (t["function"] for t in tools if t["tool"].name == tool_name),
-                None
-            )
+            # Find the tool function for the requested tool
+            tool_func = tool_functions.get(tool_name)
             
             if not tool_func:
                 return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
+
+            # Reuse a recent result of a read-only tool for identical input
+            cache_key = None
+            if tool_name in self.CACHEABLE_TOOLS:
+                cache_key = (tool_name, json_dumps(tool_input, sort_keys=True))
+                cached_result = self._tool_cache.get(cache_key)
+                if cached_result is not None:
+                    app_logger.info(f"Using cached result for tool: {tool_name}")
+                    return cached_result
             
-            # Execute the tool
-            result = await tool_func(**tool_input)
+            # Execute the tool, running synchronous functions in the tool pool
+            async with self._get_tool_semaphore(tool_name):
+                if inspect.iscoroutinefunction(tool_func):
+                    result = await tool_func(**tool_input)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        self._tool_executor,
+                        partial(tool_func, **tool_input)
+                    )
+                    if inspect.isawaitable(result):
+                        result = await result
             
-            if isinstance(result, ToolResult):
-                return result
-            else:
+            if not isinstance(result, ToolResult):
                 # Convert non-ToolResult to ToolResult
-                return ToolResult(success=True, data=result)
+                result = ToolResult(success=True, data=result)
+
+            if result.success:
+                if cache_key:
+                    self._tool_cache.set(cache_key, result)
+
+                invalidated_tools = self.TOOL_CACHE_INVALIDATIONS.get(tool_name)
+                if invalidated_tools:
+                    self._tool_cache.evict(lambda key: key[0] in invalidated_tools)
+
+            return result
                 
         except Exception as e:
             app_logger.error(f"Error executing tool {tool_name if 'tool_name' in locals() else 'unknown'}: {str(e)}")
@@ -362,17 +832,22 @@ class BedrockClient:
 
     def _convert_tool_to_spec(self, tool: Tool) -> Dict[str, Any]:
         """Convert tool to Bedrock tool specification format"""
-        return {
-            "name": tool.name,
-            "description": tool.description,
-            "inputSchema": {
-                "json": {
-                    **tool.parameters,
-                    "required": tool.required
-                }
-            }
-        }
+        return tool.spec
+
+
+_bedrock_client: Optional[BedrockClient] = None
+
+
+def get_bedrock_client() -> BedrockClient:
+    """Get the shared BedrockClient, creating it on first use"""
+    global _bedrock_client
+    if _bedrock_client is None:
+        _bedrock_client = BedrockClient()
+    return _bedrock_client
 
 
-# Create a singleton instance
-bedrock_client = BedrockClient()
+def __getattr__(name: str) -> Any:
+    """Create the bedrock_client singleton on first access (PEP 562)"""
+    if name == "bedrock_client":
+        return get_bedrock_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
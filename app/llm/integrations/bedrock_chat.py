@@ -1,57 +1,95 @@
-import json
+import re
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Dict, Any, List
 from ..bedrock import BedrockLLM
-from app.core import app_logger
+from app.core import settings, app_logger, TTLCache, LazyJson
 from app.models.chat import BookingStage
-from app.llm.tools.base import Tool, ToolResult
+from app.llm.tools.base import STATE_KEYS, Tool, ToolResult
 from app.llm.tools.membership import check_membership_points
-from app.llm.tools.flight import FlightTools
+from app.llm.tools import flight_tools
 from app.llm.tools.lounge import get_available_lounges, store_lounge_info, book_lounge
+from third_party.membership.service import membership_service
+
+
+# System prompt, read once at import instead of on every request
+SYSTEM_PROMPT = (
+    Path(__file__).resolve().parent.parent / "prompts" / "travel_buddy_prompt.txt"
+).read_text(encoding="utf-8")
+
+# Messages that are only a greeting, answered without calling the LLM
+GREETING_PATTERN = re.compile(
+    r"^(hi|hello|hey|good\s+(morning|afternoon|evening))(\s+there)?[\s!.,]*$",
+    re.IGNORECASE
+)
+
+# Requirements of each booking stage by stage name, resolved once
+STAGE_REQUIREMENTS: Dict[str, str] = {
+    stage.value: BookingStage.get_stage_requirements(stage) for stage in BookingStage
+}
 
 
 class BedrockChatIntegration:
+    # Tools whose use may change the member's points shown in the profile
+    POINTS_TOOLS = frozenset({"book_lounge", "check_membership_points"})
+
     def __init__(self):
         self.llm = BedrockLLM()
+        # Shared instance, so document caches and prefetches are not duplicated
+        self.flight_tools = flight_tools
+        self._initialized = False
         # Set system prompt
-        with open('app/llm/prompts/travel_buddy_prompt.txt', 'r') as f:
-            self.system_prompt = f.read()
+        self.system_prompt = SYSTEM_PROMPT
         
         # Create a mapping of tool names to their functions
         self.tool_functions = {
             "get_available_lounges": get_available_lounges,
             "store_lounge_info": store_lounge_info,
             "book_lounge": book_lounge,
-            "check_flight_document": FlightTools().check_flight_document,
+            "check_flight_document": self.flight_tools.check_flight_document,
             "check_membership_points": check_membership_points
         }
+        # Resolve the tools and functions of every stage once, by stage name
+        self._stage_tools = {
+            stage.value: [
+                {"tool": tool, "function": self.tool_functions[tool.name]}
+                for tool in BookingStage.get_stage_tools(stage)
+                if tool.name in self.tool_functions
+            ]
+            for stage in BookingStage
+        }
+        # generate() arguments that are fixed per stage; tools only where available
+        self._request_templates = {
+            stage: {
+                "system_prompt": self.system_prompt,
+                "temperature": 0.7,
+                "max_tokens": 1024,
+                **({"tools": tools} if tools else {})
+            }
+            for stage, tools in self._stage_tools.items()
+        }
+        # Member profiles by user ID, refreshed after points may have changed
+        self._profile_cache = TTLCache(maxsize=10000, ttl=settings.PROFILE_CACHE_TTL)
 
-    async def initialize(self):
+    async def initialize(self) -> bool:
         """Initialize the integration"""
-        if not hasattr(self, '_initialized'):
-            self._initialized = True
+        if not self._initialized:
+            # Connect to the membership table once instead of on every profile fetch.
+            # The flag is only set once that succeeds, so a failed connection is retried.
+            self._initialized = await membership_service.initialize()
+        return self._initialized
 
     def _get_tools_for_stage(self, stage_name: str) -> List[Dict[str, Any]]:
         """Get the appropriate Tool objects and their functions for the current booking stage"""
-        tools = []
-        stage_tools = BookingStage.get_stage_tools(BookingStage(stage_name))
-        
-        for tool in stage_tools:
-            if tool.name in self.tool_functions:
-                tools.append({
-                    "tool": tool,
-                    "function": self.tool_functions[tool.name]
-                })
-        
-        return tools
+        return self._stage_tools.get(stage_name, [])
 
     def _get_stage_requirements(self, stage_name: str) -> str:
         """Get the requirements for completing the current stage"""
-        return BookingStage.get_stage_requirements(BookingStage(stage_name))
+        return STAGE_REQUIREMENTS.get(stage_name, "")
 
     def _update_session_state(self, session_state: Dict[str, Any], state_updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update session state with tool results"""
-        app_logger.info(f"Updating session state with: {json.dumps(state_updates)}")
+        app_logger.info("Updating session state with: %s", LazyJson(state_updates))
         
         if not session_state:
             session_state = {}
@@ -60,12 +98,12 @@ class BedrockChatIntegration:
             session_state['stage_data'] = {}
 
         # Update stage data directly from state updates
-        for key, value in state_updates.items():
-            if key in ['flight_info', 'lounge_info', 'order_info']:
-                app_logger.info(f"Updating {key} in stage_data")
-                session_state['stage_data'][key] = value
+        stage_data = session_state['stage_data']
+        for key in state_updates.keys() & STATE_KEYS:
+            app_logger.info(f"Updating {key} in stage_data")
+            stage_data[key] = state_updates[key]
 
-        app_logger.info(f"Updated session state: {json.dumps(session_state)}")
+        app_logger.info("Updated session state: %s", LazyJson(session_state))
         return session_state
 
     async def process_message(
@@ -92,10 +130,6 @@ class BedrockChatIntegration:
             Dict containing the response and any additional data
         """
         try:
-            # Initialize if needed
-            if not hasattr(self, '_initialized'):
-                await self.initialize()
-
             # For non-Lounge services, return a message about service availability
             if service != "Lounge":
                 return {
@@ -106,55 +140,84 @@ class BedrockChatIntegration:
                     )
                 }
 
+            # Initialize if needed
+            if not self._initialized:
+                await self.initialize()
+
+            # Minute precision keeps the prompt stable and serializes as plain text
             prompt_temp = {
-                'msg_sent_time': datetime.now(),
-                'user_message': message  
+                'user_message': message,
+                'msg_sent_time': datetime.now().replace(second=0, microsecond=0).isoformat()
             }
 
+            current_stage_name = session_state.get('current_stage', BookingStage.INITIAL_ENGAGEMENT.value)
+            app_logger.info(f"Processing message in stage: {current_stage_name}")
+
+            available_tools = self._get_tools_for_stage(current_stage_name)
+            app_logger.info(f"Available Tool(s): {[t['tool'].name for t in available_tools]}")
+
             # Get user profile for context
             # handle_start_chat()已经在第一次会话加入 user profile，结合应用场景分析是否有必要在每次对话都附加上
             user_profile = await self._get_user_profile(user_id)
 
+            # A plain greeting while flight info is collected only needs the next step
+            # explained. The reply is English, so other languages still go to the LLM.
+            if self._is_opening_greeting(
+                message, current_stage_name, image_path, session_state,
+                user_profile.get("preferred_language")
+            ):
+                app_logger.info("Answering opening greeting without LLM")
+                first_name = user_profile.get("first_name")
+                return {
+                    "response": (
+                        f"Hello{f' {first_name}' if first_name else ''}! "
+                        "To find you an airport lounge, please upload a photo of your "
+                        "boarding pass or flight ticket."
+                    ),
+                    "state": session_state.get('stage_data') or {}
+                }
+
             # Prepare context for LLM           
             context = {
                 "service": f'{service} booking',
                 "current_stage": session_state.get('current_stage', BookingStage.INITIAL_ENGAGEMENT.value),
                 "has_image": bool(image_path),
                 "image_path": image_path,
+                # Structured, so the model can pass first_name/last_name to check_flight_document
                 "user_profile": user_profile,
                 "session_state": session_state
             }
 
-            current_stage_name = session_state.get('current_stage', BookingStage.INITIAL_ENGAGEMENT.value)
-            app_logger.info(f"Processing message in stage: {current_stage_name}")
-
-            available_tools = self._get_tools_for_stage(current_stage_name)
-            app_logger.info(f"Available Tool(s): {[t['tool'].name for t in available_tools]}")
-
-            # Prepare request parameters
+            # Prepare request parameters from the stage template
             request_params = {
+                **self._request_templates[current_stage_name],
                 "prompt_temp": prompt_temp,
-                "system_prompt": self.system_prompt,
-                "context": context,
-                "temperature": 0.7,
-                "max_tokens": 1024
+                "context": context
             }
 
-            # Only add tools if available for current stage
-            if available_tools:
-                request_params["tools"] = available_tools
+            # Start reading an uploaded flight document while the model decides to check it
+            if image_path and any(t['tool'].name == "check_flight_document" for t in available_tools):
+                self.flight_tools.prefetch_document(image_path)
 
-            # Generate LLM response with tools
-            response = await self.llm.generate(**request_params)
+            # generate() buffers the streamed response, so tools start as soon as they are requested
+            try:
+                response = await self.llm.generate(**request_params)
+            finally:
+                if image_path:
+                    self.flight_tools.discard_prefetch(image_path)
+
+            # Points may have changed, so fetch the profile again next turn
+            if any(t['tool'].name in self.POINTS_TOOLS for t in available_tools):
+                self._profile_cache.pop(user_id)
 
             # Handle response and state updates
             if isinstance(response, dict):
-                app_logger.info(f"Received response with data: {json.dumps(response)}")
+                app_logger.info("Received response with data: %s", LazyJson(response))
                 
                 # Get state updates from response
                 state_updates = response.get('state', {})
                 if state_updates:
-                    app_logger.info(f"Processing state updates: {json.dumps(state_updates)}")
+                    app_logger.info("Processing state updates: %s", LazyJson(state_updates))
                     session_state = self._update_session_state(session_state, state_updates)
                 
                 # Extract text response
@@ -168,7 +231,7 @@ class BedrockChatIntegration:
                 "state": session_state.get('stage_data', {}) if session_state else {}
             }
             
-            app_logger.info(f"Returning result: {json.dumps(result)}")
+            app_logger.info("Returning result: %s", LazyJson(result))
             return result
 
         except Exception as e:
@@ -182,20 +245,44 @@ class BedrockChatIntegration:
                 "error": error_msg
             }
 
+    @staticmethod
+    def _is_opening_greeting(
+        message: str,
+        stage_name: str,
+        image_path: Optional[str],
+        session_state: Dict[str, Any],
+        preferred_language: Optional[str]
+    ) -> bool:
+        """Check if the message is a bare English greeting sent before any flight info exists"""
+        if image_path or (session_state.get('stage_data') or {}).get('flight_info'):
+            return False
+        # SessionService moves a session out of INITIAL_ENGAGEMENT on its first
+        # message, so a greeting arrives in INFO_COLLECTION, which stays the stage
+        # until flight info is stored
+        if stage_name != BookingStage.INFO_COLLECTION.value:
+            return False
+        if not (preferred_language or "en").lower().startswith("en"):
+            return False
+        return bool(GREETING_PATTERN.match(message.strip()))
+
     async def _get_user_profile(self, user_id: str) -> Dict[str, Any]:
         """Get user profile information for context"""
+        cached_profile = self._profile_cache.get(user_id)
+        if cached_profile is not None:
+            return cached_profile
+
         try:
-            from third_party.membership.service import membership_service
-            await membership_service.initialize()
             profile = await membership_service.get_member_profile(user_id)
             
-            return {
+            user_profile = {
                 "first_name": profile.first_name,
                 "last_name": profile.last_name,
                 "gender": profile.gender,
                 "preferred_language": profile.preferred_language,
                 "points": profile.points
             }
+            self._profile_cache.set(user_id, user_profile)
+            return user_profile
         except Exception as e:
             app_logger.error(f"Error getting user profile: {str(e)}")
             return {}
@@ -1,16 +1,38 @@
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, Any, Optional, List
-from pydantic import BaseModel
-from ...core import app_logger
+from ...core import app_logger, LazyJson
 
 
-class Tool(BaseModel):
+# Tool result data fields that are passed on as session state updates
+STATE_KEYS = ("flight_info", "lounge_info", "order_info")
+
+
+# Plain dataclasses: these are built on every tool call and need no validation
+@dataclass
+class Tool:
     name: str
     description: str
     parameters: Dict[str, Any]
     required: List[str]
 
+    @cached_property
+    def spec(self) -> Dict[str, Any]:
+        """Bedrock tool specification, built once per tool"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "inputSchema": {
+                "json": {
+                    **self.parameters,
+                    "required": self.required
+                }
+            }
+        }
 
-class ToolResult(BaseModel):
+
+@dataclass(slots=True)
+class ToolResult:
     """Result of a tool execution"""
     success: bool
     data: Optional[Dict[str, Any]] = None
@@ -22,21 +44,12 @@ class ToolResult(BaseModel):
         This helps standardize how tools communicate state changes.
         """
         if not self.success or not self.data:
-            app_logger.info("No state update: Tool execution failed or no data")
+            app_logger.debug("No state update: Tool execution failed or no data")
             return {}
 
         # Map specific data fields to state updates
-        state_updates = {}
-        
-        if "flight_info" in self.data:
-            app_logger.info(f"Adding flight_info to state update: {self.data['flight_info']}")
-            state_updates["flight_info"] = self.data["flight_info"]
-        if "lounge_info" in self.data:
-            app_logger.info(f"Adding lounge_info to state update: {self.data['lounge_info']}")
-            state_updates["lounge_info"] = self.data["lounge_info"]
-        if "order_info" in self.data:
-            app_logger.info(f"Adding order_info to state update: {self.data['order_info']}")
-            state_updates["order_info"] = self.data["order_info"]
-
-        app_logger.info(f"Final state update: {state_updates}")
+        data = self.data
+        state_updates = {key: data[key] for key in STATE_KEYS if key in data}
+
+        app_logger.debug("Final state update: %s", LazyJson(state_updates))
         return state_updates
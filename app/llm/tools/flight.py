@@ -1,15 +1,162 @@
+import asyncio
 import boto3
-import re
-import json
+import hashlib
+import uuid
+from botocore.config import Config
 from datetime import datetime
-from typing import List, Dict
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, List, Dict, Optional
 from .base import Tool, ToolResult
-from ...core import app_logger
+from ...core import settings, app_logger, TTLCache, LazyJson
+
+try:
+    # RE2 matches in linear time, so garbled OCR text cannot cause backtracking
+    import re2 as re
+except ImportError:  # google-re2 is optional, fall back to the stdlib engine
+    import re
+
+
+# Regular expressions for matching ticket text, compiled once at import
+FLIGHT_NUMBER_PATTERN = re.compile(r'[A-Z]{2}\d{3,4}')  # e.g., CZ3456
+DATE_PATTERN = re.compile(
+    r'\d{1,2}(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)|\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}'
+)
+AIRPORT_PATTERN = re.compile(r'\b[A-Z]{3}\b')  # Three-letter airport codes
+SEAT_PATTERN = re.compile(r'(?:SEAT\s*)?(\d{1,2}[A-Z])')
+# Labels that precede the passenger name, most specific first
+PASSENGER_NAME_KEYWORDS = ("NAME OF PASSENGER", "PASSENGER", "NAME")
+
+
+@lru_cache(maxsize=1)
+def get_textract_client():
+    """Textract client shared by all FlightTools instances"""
+    return boto3.client(
+        'textract',
+        config=Config(
+            max_pool_connections=settings.TEXTRACT_MAX_POOL_CONNECTIONS,
+            retries={
+                "max_attempts": settings.TEXTRACT_MAX_RETRY_ATTEMPTS,
+                "mode": "adaptive"
+            }
+        )
+    )
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """S3 client for uploading large documents to the Textract scratch bucket"""
+    return boto3.client('s3')
+
 
 
 class FlightTools:
     def __init__(self):
-        self.textract_client = boto3.client('textract')
+        # Document analyses started before the model asked for them, by image path
+        self._prefetched: Dict[str, asyncio.Task] = {}
+        # Prefetched analyses the model used and ones it did not
+        self._prefetch_hits = 0
+        self._prefetch_misses = 0
+        # Text lines of recently analyzed documents, by SHA-256 of the image bytes
+        self._document_cache = TTLCache(maxsize=32)
+
+    @cached_property
+    def textract_client(self):
+        """Shared Textract client, created on the first document check"""
+        return get_textract_client()
+
+    @cached_property
+    def _textract_semaphore(self) -> asyncio.Semaphore:
+        """Limit on concurrent document analyses, shared by tool calls and prefetches"""
+        return asyncio.Semaphore(settings.TEXTRACT_MAX_CONCURRENCY)
+
+    @property
+    def prefetch_enabled(self) -> bool:
+        """Whether enough prefetched analyses are used to be worth their Textract calls"""
+        if not settings.DOCUMENT_PREFETCH:
+            return False
+        total = self._prefetch_hits + self._prefetch_misses
+        if total < settings.DOCUMENT_PREFETCH_MIN_SAMPLES:
+            return True
+        return self._prefetch_hits >= settings.DOCUMENT_PREFETCH_MIN_HIT_RATE * total
+
+    def prefetch_document(self, image_path: str) -> None:
+        """Start analyzing an uploaded document before the tool is called"""
+        if image_path not in self._prefetched and self.prefetch_enabled:
+            self._prefetched[image_path] = asyncio.create_task(self._extract_lines(image_path))
+
+    def discard_prefetch(self, image_path: str) -> None:
+        """Drop a prefetched analysis that the model did not use"""
+        task = self._prefetched.pop(image_path, None)
+        if task is None:
+            return
+
+        self._prefetch_misses += 1
+        if not self.prefetch_enabled:
+            app_logger.warning(
+                f"Disabling flight document prefetch: {self._prefetch_hits} of "
+                f"{self._prefetch_hits + self._prefetch_misses} prefetched analyses were used"
+            )
+
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            # Retrieve any error so it is not reported as never retrieved
+            task.exception()
+
+    async def _extract_lines(self, image_path: str) -> List[str]:
+        """Read the image and return the text lines Textract finds in it"""
+        image_bytes = await asyncio.to_thread(Path(image_path).read_bytes)
+
+        # The same ticket is often checked again within a conversation
+        digest = hashlib.sha256(image_bytes).digest()
+        cached_lines = self._document_cache.get(digest)
+        if cached_lines is not None:
+            app_logger.info("Using cached text lines for flight document")
+            return cached_lines
+
+        async with self._textract_semaphore:
+            document = {'Bytes': image_bytes}
+            if settings.TEXTRACT_S3_BUCKET and len(image_bytes) > settings.TEXTRACT_S3_MIN_BYTES:
+                # A key per upload, so concurrent analyses of one image do not delete each other's object
+                document = await self._upload_document(image_bytes, f"{digest.hex()}-{uuid.uuid4().hex}")
+
+            try:
+                # Only LINE blocks are used, so plain text detection is enough (no FORMS/TABLES)
+                response = await asyncio.to_thread(
+                    self.textract_client.detect_document_text,
+                    Document=document
+                )
+            finally:
+                if 'S3Object' in document:
+                    await self._delete_document(document['S3Object']['Name'])
+
+        lines = [block['Text'] for block in response['Blocks'] if block['BlockType'] == 'LINE']
+        self._document_cache.set(digest, lines)
+        return lines
+
+    @staticmethod
+    async def _upload_document(image_bytes: bytes, key: str) -> Dict[str, Any]:
+        """Upload a large document to the scratch bucket and return its Textract reference"""
+        await asyncio.to_thread(
+            get_s3_client().put_object,
+            Bucket=settings.TEXTRACT_S3_BUCKET,
+            Key=key,
+            Body=image_bytes
+        )
+        return {'S3Object': {'Bucket': settings.TEXTRACT_S3_BUCKET, 'Name': key}}
+
+    @staticmethod
+    async def _delete_document(key: str) -> None:
+        """Delete an analyzed document from the scratch bucket"""
+        try:
+            await asyncio.to_thread(
+                get_s3_client().delete_object,
+                Bucket=settings.TEXTRACT_S3_BUCKET,
+                Key=key
+            )
+        except Exception as e:
+            app_logger.warning(f"Failed to delete flight document {key} from S3: {str(e)}")
 
     async def check_flight_document(self, image_path: str, user_profile: Dict[str, str]) -> ToolResult:
         """
@@ -20,24 +167,11 @@ class FlightTools:
             user_profile: Dictionary containing user profile information including first_name and last_name
         """
         try:
-            # app_logger.info(f"Processing flight document: {image_path}")
-            # app_logger.info(f"User profile: {json.dumps(user_profile)}")
-            
-            # Read image file
-            with open(image_path, 'rb') as image_file:
-                image_bytes = image_file.read()
-            
-            # Call Textract
-            response = self.textract_client.analyze_document(
-                Document={'Bytes': image_bytes},
-                FeatureTypes=['FORMS', 'TABLES']
-            )
-            
-            # Extract relevant information
-            extracted_text = []
-            for block in response['Blocks']:
-                if block['BlockType'] == 'LINE':
-                    extracted_text.append(block['Text'])
+            # Reuse the analysis started when the image was uploaded, if any
+            prefetched = self._prefetched.pop(image_path, None)
+            if prefetched:
+                self._prefetch_hits += 1
+            extracted_text = await prefetched if prefetched else await self._extract_lines(image_path)
             
             # Process extracted text to identify flight details
             flight_info = self._process_extracted_text(extracted_text)
@@ -62,7 +196,8 @@ class FlightTools:
             ticket_name = flight_info['passenger_name'].strip().upper()
             
             # Check exact match for either "first_name last_name" or "last_name first_name"
-            if ticket_name != f"{first_name} {last_name}".upper() and ticket_name != f"{last_name} {first_name}".upper():
+            profile_names = (f"{first_name} {last_name}".upper(), f"{last_name} {first_name}".upper())
+            if ticket_name not in profile_names:
                 app_logger.error(f"Name mismatch - Ticket: {ticket_name}, Profile: {first_name} {last_name}")
                 return ToolResult(
                     success=False,
@@ -72,7 +207,7 @@ class FlightTools:
             
             # All validations passed
             app_logger.info("Flight document validation successful")
-            app_logger.info(f"Returning flight info: {json.dumps(flight_info)}")
+            app_logger.info("Returning flight info: %s", LazyJson(flight_info))
             
             # Create successful result with flight info
             result = ToolResult(
@@ -82,7 +217,7 @@ class FlightTools:
             
             # Log the state update that will be generated
             state_update = result.get_state_update()
-            app_logger.info(f"Tool result state update: {json.dumps(state_update)}")
+            app_logger.info("Tool result state update: %s", LazyJson(state_update))
             
             return result
             
@@ -118,62 +253,79 @@ class FlightTools:
             'seat': None
         }
         
-        # Regular expressions for matching
-        flight_pattern = r'([A-Z]{2}\d{3,4})'  # e.g., CZ3456
-        date_pattern = r'(\d{1,2}(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)|\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4})'
-        airport_pattern = r'\b([A-Z]{3})\b'  # Three-letter airport codes
-        
         for line in text_lines:
             line = line.upper()
-            
-            # Look for flight number patterns
-            flight_match = re.search(flight_pattern, line)
-            if flight_match and not fields['flight_number']:
-                fields['flight_number'] = flight_match.group(1)
-            
-            # Look for date patterns
-            date_match = re.search(date_pattern, line)
-            if date_match and not fields['date']:
-                fields['date'] = date_match.group(1)
-            
+
+            # Each field has its own pattern, so touching tokens such as
+            # JOHN2024-01-05 cannot hide each other; found fields are not searched again
+            if not fields['flight_number']:
+                flight_match = FLIGHT_NUMBER_PATTERN.search(line)
+                if flight_match:
+                    fields['flight_number'] = flight_match.group()
+
+            if not fields['date']:
+                date_match = DATE_PATTERN.search(line)
+                if date_match:
+                    fields['date'] = date_match.group()
+
             # Look for airport codes
-            airport_matches = re.finditer(airport_pattern, line)
-            airports = list(airport_matches)
+            airports = AIRPORT_PATTERN.findall(line)
             if len(airports) == 2:
                 # If we find two airport codes in one line, assume departure->arrival
-                fields['departure'] = airports[0].group(1)
-                fields['arrival'] = airports[1].group(1)
+                fields['departure'] = airports[0]
+                fields['arrival'] = airports[1]
             elif len(airports) == 1 and 'TO' in line:
                 # If we find "TO" in the line, the airport is probably arrival
-                fields['arrival'] = airports[0].group(1)
+                fields['arrival'] = airports[0]
             elif len(airports) == 1 and 'FROM' in line:
                 # If we find "FROM" in the line, the airport is probably departure
-                fields['departure'] = airports[0].group(1)
+                fields['departure'] = airports[0]
             
             # Look for seat assignments
             if 'SEAT' in line:
-                seat_match = re.search(r'(?:SEAT\s*)?(\d{1,2}[A-Z])', line)
+                seat_match = SEAT_PATTERN.search(line)
                 if seat_match and not fields['seat']:
                     fields['seat'] = seat_match.group(1)
             
-            # Improved passenger name extraction
+            # Improved passenger name extraction; every name pattern needs one of these words
             if not fields['passenger_name']:
-                # Check for common passenger name patterns
-                name_patterns = [
-                    r'NAME OF PASSENGER:?\s*([A-Z\s]+)(?:\s|$)',
-                    r'PASSENGER:?\s*([A-Z\s]+)(?:\s|$)',
-                    r'NAME:?\s*([A-Z\s]+)(?:\s|$)'
-                ]
-                
-                for pattern in name_patterns:
-                    name_match = re.search(pattern, line)
-                    if name_match:
-                        fields['passenger_name'] = name_match.group(1).strip()
-                        break
-        
-        # app_logger.info(f"Extracted fields: {json.dumps(fields)}")
+                passenger_name = self._find_passenger_name(line)
+                if passenger_name is not None:
+                    fields['passenger_name'] = passenger_name
+
+            # Stop reading the document once every field has been found
+            if all(fields.values()):
+                break
+
         return fields
 
+    @staticmethod
+    def _find_passenger_name(line: str) -> Optional[str]:
+        """
+        Find the passenger name after a name label: an optional colon, then
+        capital letters and whitespace ending at whitespace or the line end
+        """
+        for keyword in PASSENGER_NAME_KEYWORDS:
+            position = line.find(keyword)
+            while position >= 0:
+                start = position + len(keyword)
+                if line.startswith(':', start):
+                    start += 1
+
+                end = start
+                while end < len(line) and (line[end].isspace() or 'A' <= line[end] <= 'Z'):
+                    end += 1
+                if end < len(line):
+                    # The name must be followed by whitespace, so drop a partial last word
+                    end -= 1
+                    while end > start and not line[end].isspace():
+                        end -= 1
+                if end > start:
+                    return line[start:end].strip()
+
+                position = line.find(keyword, position + 1)
+        return None
+
 
 # Tool definitions using proper JSON schema format
 CHECK_FLIGHT_DOC_TOOL = Tool(
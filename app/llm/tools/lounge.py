@@ -1,9 +1,67 @@
+import asyncio
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from pydantic import TypeAdapter
 from .base import Tool, ToolResult
 from ...core import app_logger
 from ...models.lounge import Lounge, LoungeAmenity
-from third_party.loungebooking.service import lounge_service
+from third_party.loungebooking.service import LoungeInfo, lounge_service
+
+
+# Serializes a whole lounge list in one pydantic-core call
+LOUNGES_ADAPTER = TypeAdapter(List[Lounge])
+# Amenity enum members by the exact strings used in the lounge data
+AMENITY_MAP = {amenity.value: amenity for amenity in LoungeAmenity}
+
+# Serializes the one-time load of the lounge data between concurrent tool calls
+_lounge_service_lock = asyncio.Lock()
+
+
+async def _ensure_lounge_service() -> bool:
+    """Load the lounge data once, without blocking the event loop"""
+    if not lounge_service._initialized:
+        async with _lounge_service_lock:
+            if not lounge_service._initialized:
+                await asyncio.to_thread(lounge_service.initialize)
+    return lounge_service._initialized
+
+
+def _to_lounge_model(lounge: LoungeInfo, airport_code: str) -> Lounge:
+    """Convert a lounge from the lounge service into a Lounge model"""
+    # Map amenities using the exact strings from the JSON, skipping unknown ones
+    mapped_amenities = [
+        member for amenity in lounge.amenities
+        if (member := AMENITY_MAP.get(amenity)) is not None
+    ]
+
+    # Service data is already typed, so skip Pydantic validation
+    return Lounge.model_construct(
+        id=lounge.id,  # Use the ID from JSON data
+        name=lounge.name,
+        airport_code=airport_code,
+        terminal=lounge.location.terminal,
+        location_description=lounge.location.details,
+        area=lounge.location.area,
+        amenities=mapped_amenities,
+        operating_hours=lounge.openingHours,
+        max_stay_hours=2,  # Most lounges specify 2 hours maximum stay
+        distance_to_gate="Varies",  # Default value
+        rating=4.0  # Default value
+    )
+
+
+def _search_lounges(airport_code: str, terminal: Optional[str], amenities: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Search the lounge data and serialize the matching lounges"""
+    # Search for lounges with the given criteria
+    lounges = lounge_service.search_lounges(
+        airport_code=airport_code,
+        terminal=terminal,
+        amenities=amenities
+    )
+
+    # Convert to Lounge model instances
+    lounge_models = [_to_lounge_model(lounge, airport_code) for lounge in lounges]
+    return LOUNGES_ADAPTER.dump_python(lounge_models, exclude_none=True)
 
 
 async def get_available_lounges(airport_code: str, terminal: Optional[str] = None, amenities: Optional[List[str]] = None) -> ToolResult:
@@ -12,51 +70,21 @@ async def get_available_lounges(airport_code: str, terminal: Optional[str] = Non
     """
     try:
         # Initialize lounge service
-        if not lounge_service._initialized:
-            lounge_service.initialize()
-            if not lounge_service._initialized:
-                return ToolResult(
-                    success=False,
-                    error="Failed to initialize lounge service"
-                )
-        
-        # Search for lounges with the given criteria
-        lounges = lounge_service.search_lounges(
-            airport_code=airport_code,
-            terminal=terminal,
-            amenities=amenities
-        )
+        if not await _ensure_lounge_service():
+            return ToolResult(
+                success=False,
+                error="Failed to initialize lounge service"
+            )
         
-        # Convert to Lounge model instances
-        lounge_models = []
-        for lounge in lounges:
-            # Map amenities directly using the exact strings from the JSON
-            mapped_amenities = []
-            for amenity in lounge.amenities:
-                try:
-                    # Use the exact string from the JSON as defined in the enum
-                    mapped_amenities.append(LoungeAmenity(amenity))
-                except ValueError:
-                    # If amenity doesn't match enum, skip it
-                    continue
-            
-            lounge_models.append(Lounge(
-                id=lounge.id,  # Use the ID from JSON data
-                name=lounge.name,
-                airport_code=airport_code,
-                terminal=lounge.location.terminal,
-                location_description=lounge.location.details,
-                amenities=mapped_amenities,
-                operating_hours=lounge.openingHours,
-                max_stay_hours=2,  # Most lounges specify 2 hours maximum stay
-                distance_to_gate="Varies",  # Default value
-                rating=4.0,  # Default value
-                description=f"Located in {lounge.location.area}. {lounge.location.details}"
-            ))
+        # The search compares airport codes upper-cased, as they appear in the lounge data
+        airport_code = airport_code.upper()
+
+        # Searching and serializing are synchronous, so run them in a worker thread
+        serialized_lounges = await asyncio.to_thread(_search_lounges, airport_code, terminal, amenities)
         
         return ToolResult(
             success=True,
-            data={"lounges": [lounge.model_dump() for lounge in lounge_models]}
+            data={"lounges": serialized_lounges}
         )
     except Exception as e:
         app_logger.error(f"Error getting available lounges: {str(e)}")
@@ -101,13 +129,11 @@ async def book_lounge(
     """
     try:
         # Initialize lounge service
-        if not lounge_service._initialized:
-            lounge_service.initialize()
-            if not lounge_service._initialized:
-                return ToolResult(
-                    success=False,
-                    error="Failed to initialize lounge service"
-                )
+        if not await _ensure_lounge_service():
+            return ToolResult(
+                success=False,
+                error="Failed to initialize lounge service"
+            )
 
         # Normalize lounge_id to lowercase to handle case-insensitive matching
         normalized_lounge_id = lounge_id.lower()
@@ -1,10 +1,26 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from gradio.routes import mount_gradio_app
 
 from .core import settings, app_logger
 from .chatbot.chat_ui import chat_interface  # Import the specific chat_ui instance
 from .services import dynamodb_service
+from third_party.loungebooking.service import lounge_service
+
+
+class NonStreamingGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves Gradio's queue, heartbeat and stream endpoints alone"""
+    # Path segments of endpoints that answer with server-sent events, which
+    # must reach the browser event by event instead of in compressed chunks
+    STREAM_PATH_SEGMENTS = frozenset({"queue", "heartbeat", "stream"})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.STREAM_PATH_SEGMENTS.isdisjoint(scope["path"].split("/")):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
 
 # Initialize FastAPI app
@@ -23,6 +39,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger non-streaming responses; level 1 keeps the CPU cost negligible
+app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024, compresslevel=1)
+
 # Create Gradio interface
 interface = chat_interface.create_interface()
 
@@ -44,6 +63,13 @@ async def startup_event():
         app_logger.error(f"Failed to connect to DynamoDB table: {str(e)}")
         app_logger.warning("Application starting without DynamoDB connection")
 
+    # Load the lounge data now instead of on the first lounge tool call
+    await asyncio.to_thread(lounge_service.initialize)
+    if lounge_service._initialized:
+        app_logger.info("Successfully loaded lounge data")
+    else:
+        app_logger.warning("Application starting without lounge data")
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """
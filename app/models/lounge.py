@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -52,17 +52,24 @@ class Lounge(BaseModel):
     airport_code: str
     terminal: str
     location_description: str
+    # Airport area of the lounge, only used to build the description
+    area: str = Field(default="", exclude=True)
     amenities: List[LoungeAmenity]
     operating_hours: str
     max_stay_hours: int = 2  # Most lounges specify 2 hours maximum stay
     distance_to_gate: Optional[str] = None
     rating: Optional[float] = None
-    description: str
     metadata: Optional[dict] = None
 
     class Config:
         from_attributes = True
 
+    @computed_field
+    @property
+    def description(self) -> str:
+        """Short description, built only when the lounge is serialized"""
+        return f"Located in {self.area}. {self.location_description}"
+
 
 class LoungeBooking(BaseModel):
     booking_id: str
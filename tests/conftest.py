@@ -0,0 +1,8 @@
+import os
+
+# Some services create their boto3 clients at import; no AWS call is made by the unit tests
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-southeast-1")
+
+# Import the models before app.llm: app.models.chat imports the tool specs,
+# so importing a tool module first runs into the models/tools import cycle
+import app.models  # noqa: E402,F401
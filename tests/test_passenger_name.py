@@ -0,0 +1,52 @@
+# run it using:
+# python -m pytest tests/test_passenger_name.py
+import random
+import re
+
+import pytest
+
+from app.llm.tools.flight import FlightTools
+
+# The patterns FlightTools._find_passenger_name replaced, most specific first
+PASSENGER_NAME_PATTERNS = [
+    re.compile(r'NAME OF PASSENGER:?\s*([A-Z\s]+)(?:\s|$)'),
+    re.compile(r'PASSENGER:?\s*([A-Z\s]+)(?:\s|$)'),
+    re.compile(r'NAME:?\s*([A-Z\s]+)(?:\s|$)')
+]
+
+
+def find_passenger_name_with_regex(line):
+    """Passenger name as the previous regex implementation found it"""
+    for pattern in PASSENGER_NAME_PATTERNS:
+        name_match = pattern.search(line)
+        if name_match:
+            return name_match.group(1).strip()
+    return None
+
+
+@pytest.mark.parametrize("line", [
+    "NAME OF PASSENGER: JOHN SMITH",
+    "NAME OF PASSENGER:JOHN SMITH ",
+    "PASSENGER: JOHN SMITH",
+    "PASSENGER NAME: JOHN SMITH",
+    "NAME: SMITH JOHN MR",
+    "NAME SMITH/JOHN",
+    "NAME: JOHN SMITH1",
+    "NAME:  X1",
+    "NAME:",
+    "NAME",
+    "PASSENGER:1234 NAME: JANE DOE",
+    "Name: john smith",
+    "FLIGHT CZ3456 SEAT 12A",
+    "",
+])
+def test_scanner_matches_regex(line):
+    assert FlightTools._find_passenger_name(line) == find_passenger_name_with_regex(line)
+
+
+def test_scanner_matches_regex_on_generated_lines():
+    rng = random.Random(0)
+    alphabet = ["NAME", "PASSENGER", "NAME OF PASSENGER", ":", " ", "\t", "/", "1", "a", "J", "SMITH", "OF"]
+    for _ in range(5000):
+        line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+        assert FlightTools._find_passenger_name(line) == find_passenger_name_with_regex(line), line
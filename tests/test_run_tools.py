@@ -0,0 +1,86 @@
+# run it using:
+# python -m pytest tests/test_run_tools.py
+import asyncio
+
+from app.llm.bedrock import BedrockClient
+from app.llm.tools.base import ToolResult
+
+
+def run_turn(tool_uses, delays):
+    """
+    Run one model turn of tools through BedrockClient._run_tools with fake
+    tools that sleep for the given delay and record when they start and finish
+    """
+    events = []
+
+    def fake_tool(name):
+        async def tool(call):
+            events.append(("start", call))
+            await asyncio.sleep(delays[call])
+            events.append(("finish", call))
+            return ToolResult(success=True, data={"call": call, "tool": name})
+        return tool
+
+    tool_functions = {
+        name: fake_tool(name)
+        for name in ("get_available_lounges", "check_membership_points", "book_lounge", "store_lounge_info")
+    }
+
+    async def run():
+        client = BedrockClient()
+        results = await client._run_tools(tool_uses, tool_functions, asyncio.Semaphore(8))
+        return client._collect_tool_results(tool_uses, results, {})
+
+    return asyncio.run(run()), events
+
+
+def tool_use(tool_use_id, name):
+    return {"toolUseId": tool_use_id, "name": name, "input": {"call": tool_use_id}}
+
+
+def test_read_only_tools_run_concurrently():
+    tool_uses = [tool_use("a", "get_available_lounges"), tool_use("b", "check_membership_points")]
+    _, events = run_turn(tool_uses, {"a": 0.05, "b": 0.01})
+
+    # Both started before either finished, and the faster one finished first
+    assert events[:2] == [("start", "a"), ("start", "b")]
+    assert events[2:] == [("finish", "b"), ("finish", "a")]
+
+
+def test_side_effecting_tools_run_one_at_a_time_in_tool_use_order():
+    tool_uses = [tool_use("a", "book_lounge"), tool_use("b", "store_lounge_info"), tool_use("c", "book_lounge")]
+    _, events = run_turn(tool_uses, {"a": 0.03, "b": 0.01, "c": 0.02})
+
+    assert events == [
+        ("start", "a"), ("finish", "a"),
+        ("start", "b"), ("finish", "b"),
+        ("start", "c"), ("finish", "c"),
+    ]
+
+
+def test_side_effecting_tools_never_overlap_read_only_tools_in_order():
+    tool_uses = [
+        tool_use("a", "get_available_lounges"),
+        tool_use("b", "book_lounge"),
+        tool_use("c", "book_lounge"),
+        tool_use("d", "check_membership_points"),
+    ]
+    _, events = run_turn(tool_uses, {"a": 0.05, "b": 0.02, "c": 0.01, "d": 0.01})
+
+    bookings = [event for event in events if event[1] in ("b", "c")]
+    assert bookings == [("start", "b"), ("finish", "b"), ("start", "c"), ("finish", "c")]
+
+
+def test_tool_results_keep_tool_use_order():
+    tool_uses = [
+        tool_use("a", "get_available_lounges"),
+        tool_use("b", "book_lounge"),
+        tool_use("c", "check_membership_points"),
+        tool_use("d", "store_lounge_info"),
+    ]
+    tool_results, events = run_turn(tool_uses, {"a": 0.04, "b": 0.01, "c": 0.001, "d": 0.01})
+
+    # Tools finish out of order, results still follow the toolUse blocks
+    assert [event[1] for event in events if event[0] == "finish"] != ["a", "b", "c", "d"]
+    assert [block["toolResult"]["toolUseId"] for block in tool_results] == ["a", "b", "c", "d"]
+    assert [block["toolResult"]["content"][0]["json"]["call"] for block in tool_results] == ["a", "b", "c", "d"]
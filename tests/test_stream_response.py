@@ -0,0 +1,141 @@
+# run it using:
+# python -m pytest tests/test_stream_response.py
+import asyncio
+import copy
+import json
+
+import pytest
+
+from app.llm.bedrock import BedrockClient
+from app.llm.tools.base import Tool, ToolResult
+
+
+class FakeRuntimeClient:
+    """Bedrock runtime client that replays one scripted converse_stream turn per call"""
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.requests = []
+
+    def converse_stream(self, **request_params):
+        self.requests.append(copy.deepcopy(request_params["messages"]))
+        return {"stream": iter(self.turns.pop(0))}
+
+
+def tool_use_turn(text, tool_uses):
+    """Events of a model turn that says something and then requests tools"""
+    events = [{"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": text}}},
+              {"contentBlockStop": {"contentBlockIndex": 0}}]
+    for index, (tool_use_id, name, tool_input) in enumerate(tool_uses, start=1):
+        serialized = json.dumps(tool_input)
+        events += [
+            {"contentBlockStart": {"contentBlockIndex": index,
+                                   "start": {"toolUse": {"toolUseId": tool_use_id, "name": name}}}},
+            # Tool input arrives in several JSON fragments
+            {"contentBlockDelta": {"contentBlockIndex": index, "delta": {"toolUse": {"input": serialized[:5]}}}},
+            {"contentBlockDelta": {"contentBlockIndex": index, "delta": {"toolUse": {"input": serialized[5:]}}}},
+            {"contentBlockStop": {"contentBlockIndex": index}},
+        ]
+    events.append({"messageStop": {"stopReason": "tool_use"}})
+    return events
+
+
+def text_turn(*chunks):
+    """Events of a final model turn that only streams text"""
+    events = [{"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": chunk}}} for chunk in chunks]
+    events += [{"contentBlockStop": {"contentBlockIndex": 0}}, {"messageStop": {"stopReason": "end_turn"}}]
+    return events
+
+
+def make_tool(name):
+    return Tool(name=name, description=name, parameters={"type": "object", "properties": {}}, required=[])
+
+
+def make_client(turns):
+    client = BedrockClient()
+    client.__dict__["runtime_client"] = FakeRuntimeClient(turns)
+    return client
+
+
+def test_generate_response_runs_streamed_tool_round_trip():
+    calls = []
+
+    async def get_available_lounges(airport_code):
+        calls.append(airport_code)
+        return ToolResult(success=True, data={"lounges": ["Blue Sky"]})
+
+    async def store_lounge_info(lounge_id):
+        return ToolResult(success=True, data={"lounge_info": {"lounge_id": lounge_id}})
+
+    client = make_client([
+        tool_use_turn("Let me check", [
+            ("t1", "get_available_lounges", {"airport_code": "PVG"}),
+            ("t2", "store_lounge_info", {"lounge_id": "L1"}),
+        ]),
+        text_turn("Found ", "Blue Sky"),
+    ])
+    tools = [
+        {"tool": make_tool("get_available_lounges"), "function": get_available_lounges},
+        {"tool": make_tool("store_lounge_info"), "function": store_lounge_info},
+    ]
+
+    response = asyncio.run(client.generate_response(
+        system_prompt="system", prompt_temp="Find a lounge", context={}, tools=tools
+    ))
+
+    # Only the final turn's text is returned, with the tools' state updates
+    assert response == {"response": "Found Blue Sky", "state": {"lounge_info": {"lounge_id": "L1"}}}
+    assert calls == ["PVG"]
+
+    # The follow-up request carries the assistant toolUse turn and the toolResults in toolUse order
+    first_request, second_request = client.runtime_client.requests
+    assert len(first_request) == 1
+    assistant, tool_results = second_request[1], second_request[2]
+    assert assistant["role"] == "assistant"
+    assert assistant["content"][0] == {"text": "Let me check"}
+    assert [block["toolUse"]["input"] for block in assistant["content"][1:]] == [
+        {"airport_code": "PVG"}, {"lounge_id": "L1"}
+    ]
+    assert tool_results["role"] == "user"
+    assert [block["toolResult"]["toolUseId"] for block in tool_results["content"]] == ["t1", "t2"]
+    assert all(block["toolResult"]["status"] == "success" for block in tool_results["content"])
+
+
+def test_stream_response_yields_text_tool_uses_and_state():
+    async def book_lounge(lounge_id):
+        return ToolResult(success=True, data={"order_info": {"booking_id": "B1"}})
+
+    client = make_client([
+        tool_use_turn("Booking", [("t1", "book_lounge", {"lounge_id": "L1"})]),
+        text_turn("Booked"),
+    ])
+    tools = [{"tool": make_tool("book_lounge"), "function": book_lounge}]
+
+    async def collect():
+        return [event async for event in client.stream_response(
+            system_prompt="system", prompt_temp="Book it", context={}, tools=tools
+        )]
+
+    events = asyncio.run(collect())
+
+    assert events == [
+        {"text": "Booking"},
+        {"toolUse": {"toolUseId": "t1", "name": "book_lounge", "input": {"lounge_id": "L1"}}},
+        {"text": "Booked"},
+        {"state": {"order_info": {"booking_id": "B1"}}},
+    ]
+
+
+def test_tool_round_trips_are_capped():
+    async def get_available_lounges(airport_code):
+        return ToolResult(success=True, data={"lounges": []})
+
+    client = make_client([
+        tool_use_turn("Checking", [(f"t{turn}", "get_available_lounges", {"airport_code": "PVG"})])
+        for turn in range(2)
+    ])
+    tools = [{"tool": make_tool("get_available_lounges"), "function": get_available_lounges}]
+
+    with pytest.raises(Exception, match="Maximum number of tool use recursions"):
+        asyncio.run(client.generate_response(
+            system_prompt="system", prompt_temp="Loop", context={}, tools=tools, max_recursions=2
+        ))
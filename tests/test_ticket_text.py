@@ -0,0 +1,124 @@
+# run it using:
+# python -m pytest tests/test_ticket_text.py
+import random
+import re
+
+import pytest
+
+from app.llm.tools.flight import FlightTools
+
+
+def process_extracted_text_baseline(text_lines):
+    """The original line-by-line ticket parser, kept to compare against"""
+    fields = {
+        'flight_number': None,
+        'passenger_name': None,
+        'departure': None,
+        'arrival': None,
+        'date': None,
+        'seat': None
+    }
+    flight_pattern = r'([A-Z]{2}\d{3,4})'
+    date_pattern = r'(\d{1,2}(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)|\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4})'
+    airport_pattern = r'\b([A-Z]{3})\b'
+    name_patterns = [
+        r'NAME OF PASSENGER:?\s*([A-Z\s]+)(?:\s|$)',
+        r'PASSENGER:?\s*([A-Z\s]+)(?:\s|$)',
+        r'NAME:?\s*([A-Z\s]+)(?:\s|$)'
+    ]
+
+    for line in text_lines:
+        line = line.upper()
+
+        flight_match = re.search(flight_pattern, line)
+        if flight_match and not fields['flight_number']:
+            fields['flight_number'] = flight_match.group(1)
+
+        date_match = re.search(date_pattern, line)
+        if date_match and not fields['date']:
+            fields['date'] = date_match.group(1)
+
+        airports = list(re.finditer(airport_pattern, line))
+        if len(airports) == 2:
+            fields['departure'] = airports[0].group(1)
+            fields['arrival'] = airports[1].group(1)
+        elif len(airports) == 1 and 'TO' in line:
+            fields['arrival'] = airports[0].group(1)
+        elif len(airports) == 1 and 'FROM' in line:
+            fields['departure'] = airports[0].group(1)
+
+        if 'SEAT' in line:
+            seat_match = re.search(r'(?:SEAT\s*)?(\d{1,2}[A-Z])', line)
+            if seat_match and not fields['seat']:
+                fields['seat'] = seat_match.group(1)
+
+        if not fields['passenger_name']:
+            for pattern in name_patterns:
+                name_match = re.search(pattern, line)
+                if name_match:
+                    fields['passenger_name'] = name_match.group(1).strip()
+                    break
+
+    return fields
+
+
+@pytest.fixture(scope="module")
+def flight_tools():
+    return FlightTools()
+
+
+@pytest.mark.parametrize("line, expected", [
+    # A flight number directly before a date must not swallow the date digits
+    ("JOHN2024-01-05", {"date": "2024-01-05"}),
+    ("CZ34562024-01-05", {"flight_number": "CZ3456", "date": "2024-01-05"}),
+    ("MU5101 05JAN", {"flight_number": "MU5101", "date": "05JAN"}),
+    ("AB12345JAN", {"flight_number": "AB1234", "date": "45JAN"}),
+    ("FLIGHT CA981 05/01/2024", {"flight_number": "CA981", "date": "05/01/2024"}),
+])
+def test_touching_tokens_are_all_found(flight_tools, line, expected):
+    fields = flight_tools._process_extracted_text([line])
+    for field, value in expected.items():
+        assert fields[field] == value
+    assert fields == process_extracted_text_baseline([line])
+
+
+def test_ticket_matches_baseline(flight_tools):
+    ticket = [
+        "BOARDING PASS",
+        "NAME OF PASSENGER: JOHN SMITH",
+        "FLIGHT CZ3456 DATE 2024-01-05",
+        "FROM PVG",
+        "TO PEK",
+        "SEAT 12A",
+    ]
+    fields = flight_tools._process_extracted_text(ticket)
+    assert fields == process_extracted_text_baseline(ticket)
+    assert fields == {
+        "flight_number": "CZ3456",
+        "passenger_name": "JOHN SMITH",
+        "departure": "PVG",
+        "arrival": "PEK",
+        "date": "2024-01-05",
+        "seat": "12A",
+    }
+
+
+def test_stops_reading_once_every_field_is_found(flight_tools):
+    ticket = [
+        "NAME: JANE DOE",
+        "MU5101 PVG SIN 05JAN SEAT 3C",
+        "HKG NRT",
+    ]
+    fields = flight_tools._process_extracted_text(ticket)
+    assert (fields["departure"], fields["arrival"]) == ("PVG", "SIN")
+
+
+def test_generated_lines_match_baseline(flight_tools):
+    rng = random.Random(0)
+    pieces = [
+        "CZ3456", "MU510", "JOHN", "2024-01-05", "05/01/2024", "5JAN", "12DEC", "PVG", "PEK",
+        "SEAT", "12A", "NAME:", "PASSENGER", "TO", "FROM", " ", " ", "-", "/", "1", "9", "ab",
+    ]
+    for _ in range(3000):
+        line = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 8)))
+        assert flight_tools._process_extracted_text([line]) == process_extracted_text_baseline([line]), line
@@ -0,0 +1,93 @@
+# run it using:
+# python -m pytest tests/test_trim_messages.py
+import pytest
+
+from app.core import settings
+from app.llm.bedrock import BedrockClient, _content_chars
+
+
+def build_conversation(turns):
+    """First user message, then alternating toolUse/toolResult and text turns"""
+    messages = [{"role": "user", "content": [{"text": "I need a lounge"}]}]
+    for turn in range(turns):
+        tool_use_id = f"tool-{turn}"
+        messages.append({"role": "assistant", "content": [
+            {"text": "Checking"},
+            {"toolUse": {"toolUseId": tool_use_id, "name": "get_available_lounges", "input": {"turn": turn}}}
+        ]})
+        messages.append({"role": "user", "content": [
+            {"toolResult": {"toolUseId": tool_use_id, "content": [{"json": {"lounges": ["x" * 50]}}]}}
+        ]})
+        messages.append({"role": "assistant", "content": [{"text": f"Answer {turn}"}]})
+        messages.append({"role": "user", "content": [{"text": f"Question {turn}"}]})
+    return messages
+
+
+def assert_tool_pairs_intact(messages):
+    """Every toolResult must directly follow the assistant message holding its toolUse"""
+    for index, message in enumerate(messages):
+        for block in message["content"]:
+            if "toolResult" in block:
+                previous = messages[index - 1]
+                assert index > 0 and previous["role"] == "assistant"
+                tool_use_ids = {b["toolUse"]["toolUseId"] for b in previous["content"] if "toolUse" in b}
+                assert block["toolResult"]["toolUseId"] in tool_use_ids
+
+
+@pytest.mark.parametrize("max_messages", [2, 3, 4, 5, 6, 9])
+def test_trim_by_message_count_keeps_tool_pairs(monkeypatch, max_messages):
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_MESSAGES", max_messages)
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_CHARS", 10 ** 9)
+    messages = build_conversation(6)
+
+    trimmed = BedrockClient._trim_messages(messages)
+
+    assert trimmed[0] is messages[0]
+    assert trimmed[1]["role"] == "assistant"
+    assert trimmed[-1] is messages[-1]
+    assert len(trimmed) < len(messages)
+    assert_tool_pairs_intact(trimmed)
+
+
+@pytest.mark.parametrize("max_chars", [1, 300, 800, 2000])
+def test_trim_by_size_keeps_tool_pairs(monkeypatch, max_chars):
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_MESSAGES", 1000)
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_CHARS", max_chars)
+    messages = build_conversation(6)
+
+    trimmed = BedrockClient._trim_messages(messages)
+
+    assert trimmed[0] is messages[0]
+    assert trimmed[1]["role"] == "assistant"
+    assert_tool_pairs_intact(trimmed)
+
+
+def test_short_conversation_is_unchanged(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_MESSAGES", 1000)
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_CHARS", 10 ** 9)
+    messages = build_conversation(2)
+
+    assert BedrockClient._trim_messages(messages) is messages
+
+
+def test_size_estimate_counts_text_and_tool_payloads():
+    messages = build_conversation(1)
+    text_chars = _content_chars(messages[0]["content"])
+    result_chars = _content_chars(messages[2]["content"])
+
+    assert text_chars == len("text") + len("I need a lounge")
+    assert result_chars > 50
+
+
+def test_compact_replaces_only_large_older_tool_results(monkeypatch):
+    monkeypatch.setattr(settings, "TOOL_RESULT_KEEP_TURNS", 1)
+    monkeypatch.setattr(settings, "TOOL_RESULT_COMPACT_CHARS", 40)
+    messages = build_conversation(3)
+    messages[2]["content"][0]["toolResult"]["content"] = [{"text": "small"}]
+
+    BedrockClient._compact_tool_results(messages)
+
+    results = [m["content"][0]["toolResult"]["content"] for m in messages if "toolResult" in m["content"][0]]
+    assert results[0] == [{"text": "small"}]
+    assert results[1][0]["text"].startswith("Result omitted")
+    assert results[2] == [{"json": {"lounges": ["x" * 50]}}]
@@ -0,0 +1,70 @@
+# run it using:
+# python -m pytest tests/test_ttl_cache.py
+import pytest
+
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+
+    clock[0] += 59
+    assert ttl_cache.get("a") == 1
+
+    clock[0] += 1
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("a", "missing") == "missing"
+    assert len(ttl_cache) == 0
+
+
+def test_set_restarts_ttl(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    clock[0] += 30
+    ttl_cache.set("a", 2)
+    clock[0] += 45
+    assert ttl_cache.get("a") == 2
+
+
+def test_entries_without_ttl_do_not_expire(clock):
+    ttl_cache = TTLCache(maxsize=10)
+    ttl_cache.set("a", 1)
+    clock[0] += 10 ** 9
+    assert ttl_cache.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    # Reading "a" makes "b" the least recently used entry
+    assert ttl_cache.get("a") == 1
+    ttl_cache.set("c", 3)
+
+    assert len(ttl_cache) == 2
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_pop_returns_value_only_before_expiry(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.pop("a") == 1
+    assert ttl_cache.get("a") is None
+
+    clock[0] += 60
+    assert ttl_cache.pop("b") is None
+    assert len(ttl_cache) == 0
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 import boto3
 from .models import MembershipProfile
@@ -11,15 +12,21 @@ class MembershipService:
         )
         self.table_name = "travel_buddy_membership"
         self.table = None
+        self._initialized = False
 
     async def initialize(self) -> bool:
         """Initialize connection to DynamoDB table"""
+        # The table only needs to be verified once per process
+        if self._initialized:
+            return True
+
         try:
             if not self.table:
                 self.table = self.dynamodb.Table(self.table_name)
             # Verify table exists
-            self.table.load()
+            await asyncio.to_thread(self.table.load)
             app_logger.info(f"Connected to DynamoDB table: {self.table_name}")
+            self._initialized = True
             return True
         except Exception as e:
             app_logger.error(f"Error connecting to DynamoDB table: {str(e)}")
@@ -31,7 +38,8 @@ class MembershipService:
             if not self.table:
                 await self.initialize()
             
-            response = self.table.get_item(
+            response = await asyncio.to_thread(
+                self.table.get_item,
                 Key={
                     'pk': f'MEMBER#{member_id}',
                     'sk': 'PROFILE'